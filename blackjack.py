@@ -5,18 +5,13 @@ from typing import Dict, List, Optional
 import random
 from dataclasses import dataclass, field
 from enum import Enum
-from token_manager import TokenManager
-
-class Blackjack(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.tables: Dict[str, BlackjackTable] = {}
-        self.token_manager = TokenManager()
+from token_manager import token_manager
 
 class Blackjack(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.tables: Dict[str, BlackjackTable] = {}
+        self.token_manager = token_manager
 
 # Card and Game Classes
 class Suit(Enum):
@@ -122,7 +117,7 @@ class Player:
         return sum(hand.bet for hand in self.hands)
     
     def get_user_tokens(self) -> int:
-        return user_tokens.get(str(self.user.id), 0)
+        return get_user_tokens(self.user.id)
     
     def can_afford_bet(self, amount: int) -> bool:
         return self.get_user_tokens() >= amount
@@ -209,13 +204,18 @@ class BlackjackTable:
 # Global storage
 tables: Dict[str, BlackjackTable] = {}
 
+# Permission overwrites for private game channels, shared by every table
+HIDDEN_OVERWRITE = discord.PermissionOverwrite(read_messages=False)
+BOT_OVERWRITE = discord.PermissionOverwrite(read_messages=True, send_messages=True)
+# Blackjack category per guild, so table creation doesn't rescan guild.categories
+categories: Dict[int, discord.CategoryChannel] = {}
+
 # Token management functions
 def get_user_tokens(user_id: int) -> int:
-    return user_tokens.get(str(user_id), 0)
+    return token_manager.get_tokens(str(user_id))
 
 def set_user_tokens(user_id: int, amount: int):
-    user_tokens[str(user_id)] = max(0, amount)
-    save_user_tokens(user_tokens)
+    token_manager.set_tokens(str(user_id), max(0, amount))
 
 def add_user_tokens(user_id: int, amount: int):
     current = get_user_tokens(user_id)
@@ -425,7 +425,8 @@ class BettingView(discord.ui.View):
         
         # Update betting embed
         betting_embed = create_betting_embed(self.table)
-        await self.table.betting_embed_message.edit(embed=betting_embed, view=self)
+        # Buttons are unchanged, so only the embed is sent
+        await self.table.betting_embed_message.edit(embed=betting_embed)
         
         await interaction.response.send_message(f"Bet placed: {amount} tokens!", ephemeral=True)
 
@@ -617,15 +618,24 @@ class BlackjackView(discord.ui.View):
             if self.table.current_player_index >= len(self.table.players):
                 self.table.current_player_index = 0
             await self.update_game_display(interaction)
-            await interaction.response.send_message("You left the table and got your bets back.", ephemeral=True)
+            await interaction.followup.send("You left the table and got your bets back.", ephemeral=True)
     
     async def update_game_display(self, interaction: discord.Interaction):
         # Update dealer embed
         dealer_embed = create_dealer_embed(self.table)
-        try:
-            await self.table.dealer_embed_message.edit(embed=dealer_embed, view=self)
-        except:
-            pass
+        dealer_message = self.table.dealer_embed_message
+        if (not interaction.response.is_done() and dealer_message and interaction.message
+                and interaction.message.id == dealer_message.id):
+            # The click came from the dealer message, so editing it also acknowledges the interaction
+            try:
+                await interaction.response.edit_message(embed=dealer_embed, view=self)
+            except (discord.errors.NotFound, discord.errors.HTTPException):
+                pass
+        else:
+            try:
+                await dealer_message.edit(embed=dealer_embed, view=self)
+            except:
+                pass
         
         # Update player embeds
         for player in self.table.players:
@@ -731,12 +741,11 @@ class JoinTableView(discord.ui.View):
         self.add_item(join_button)
     
     async def join_table(self, interaction: discord.Interaction):
-        if self.table_id not in tables:
+        table = tables.get(self.table_id)
+        if table is None:
             await interaction.response.send_message("Table no longer exists!", ephemeral=True)
             return
         
-        table = tables[self.table_id]
-        
         if table.state not in [GameState.WAITING, GameState.BETTING]:
             await interaction.response.send_message("Game is already in progress!", ephemeral=True)
             return
@@ -767,16 +776,19 @@ async def create_table(ctx, table_id: str = None):
     
     # Create game channel
     guild = ctx.guild
-    category = discord.utils.get(guild.categories, name="🎰 Blackjack Tables")
+    category = categories.get(guild.id)
     if not category:
-        category = await guild.create_category("🎰 Blackjack Tables")
+        category = discord.utils.get(guild.categories, name="🎰 Blackjack Tables")
+        if not category:
+            category = await guild.create_category("🎰 Blackjack Tables")
+        categories[guild.id] = category
     
     game_channel = await guild.create_text_channel(
         f"blackjack-{table_id}",
         category=category,
         overwrites={
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True)
+            guild.default_role: HIDDEN_OVERWRITE,
+            guild.me: BOT_OVERWRITE
         }
     )
     
@@ -818,12 +830,11 @@ async def start_betting(ctx, table_id: str = None):
             await ctx.send(f"Multiple tables found: {table_list}\nPlease specify: `!start_betting <table_id>`")
             return
     
-    if table_id not in tables:
+    table = tables.get(table_id)
+    if table is None:
         await ctx.send(f"Table '{table_id}' not found!")
         return
     
-    table = tables[table_id]
-    
     if len(table.players) == 0:
         await ctx.send("No players in table!")
         return
@@ -844,10 +855,13 @@ async def start_betting(ctx, table_id: str = None):
     # Create betting embed
     betting_embed = create_betting_embed(table)
     betting_view = BettingView(table)
-    table.betting_embed_message = await game_channel.send(embed=betting_embed, view=betting_view)
+    table.betting_embed_message = await game_channel.send(
+        "🎰 **Place your bets!** Use the buttons below or type `!bet <amount>`",
+        embed=betting_embed,
+        view=betting_view
+    )
     
     await ctx.send(f"Betting phase started in {game_channel.mention}!")
-    await game_channel.send("🎰 **Place your bets!** Use the buttons below or type `!bet <amount>`")
 
 @bot.command(name='bet')
 async def place_bet_command(ctx, amount: int):
@@ -894,9 +908,8 @@ async def place_bet_command(ctx, amount: int):
     # Update betting embed
     if user_table.betting_embed_message:
         betting_embed = create_betting_embed(user_table)
-        betting_view = BettingView(user_table)
         try:
-            await user_table.betting_embed_message.edit(embed=betting_embed, view=betting_view)
+            await user_table.betting_embed_message.edit(embed=betting_embed)
         except:
             pass
     
@@ -917,11 +930,10 @@ async def leave_table_command(ctx, table_id: str = None):
             await ctx.send(f"Multiple tables found: {table_list}\nPlease specify: `!leave <table_id>`")
             return
     
-    if table_id not in tables:
+    table = tables.get(table_id)
+    if table is None:
         await ctx.send(f"Table '{table_id}' not found!")
         return
-    
-    table = tables[table_id]
     player = next((p for p in table.players if p.user.id == ctx.author.id), None)
     
     if not player:
@@ -959,12 +971,11 @@ async def start_game(ctx, table_id: str = None):
             await ctx.send(f"Multiple tables found: {table_list}\nPlease specify: `!start_game <table_id>`")
             return
     
-    if table_id not in tables:
+    table = tables.get(table_id)
+    if table is None:
         await ctx.send(f"Table '{table_id}' not found!")
         return
     
-    table = tables[table_id]
-    
     # Check if all players have bet
     players_with_bets = [p for p in table.players if p.has_bet]
     if len(players_with_bets) == 0:
@@ -1066,12 +1077,11 @@ async def deal_new_hand(ctx, table_id: str = None):
             await ctx.send(f"Multiple tables found: {table_list}\nPlease specify: `!deal_new_hand <table_id>`")
             return
     
-    if table_id not in tables:
+    table = tables.get(table_id)
+    if table is None:
         await ctx.send(f"Table '{table_id}' not found!")
         return
     
-    table = tables[table_id]
-    
     if len(table.players) == 0:
         await ctx.send("No players in table!")
         return
@@ -1111,10 +1121,13 @@ async def deal_new_hand(ctx, table_id: str = None):
     # Start new betting phase
     betting_embed = create_betting_embed(table)
     betting_view = BettingView(table)
-    table.betting_embed_message = await game_channel.send(embed=betting_embed, view=betting_view)
+    table.betting_embed_message = await game_channel.send(
+        "🎰 **New round! Place your bets!** 🎰",
+        embed=betting_embed,
+        view=betting_view
+    )
     
     await ctx.send(f"New betting phase started for table {table_id}!")
-    await game_channel.send("🎰 **New round! Place your bets!** 🎰")
 
 @bot.command(name='close_table')
 @commands.has_permissions(administrator=True)
@@ -1132,12 +1145,11 @@ async def close_table(ctx, table_id: str = None):
             await ctx.send(f"Multiple tables found: {table_list}\nPlease specify: `!close_table <table_id>`")
             return
     
-    if table_id not in tables:
+    table = tables.get(table_id)
+    if table is None:
         await ctx.send(f"Table '{table_id}' not found!")
         return
     
-    table = tables[table_id]
-    
     # Return any active bets
     for player in table.players:
         for hand in player.hands:
@@ -1172,11 +1184,18 @@ async def list_tables(ctx):
     
     await ctx.send(embed=embed)
 
+@bot.event
+async def on_guild_channel_delete(channel):
+    # Forget the cached category if it was deleted so it gets recreated
+    cached = categories.get(channel.guild.id)
+    if cached and cached.id == channel.id:
+        del categories[channel.guild.id]
+
 @bot.event
 async def on_ready():
     print(f'{bot.user} has landed at the casino!')
     print(f'Bot is ready to deal some cards and tokens!')
-    print(f'Loaded {len(user_tokens)} users with tokens')
+    print(f'Loaded {len(token_manager.tokens)} users with tokens')
 
 async def setup(bot):
     await bot.add_cog(Blackjack(bot))
\ No newline at end of file
@@ -2,7 +2,6 @@ import discord
 from discord.ext import commands
 import os
 import dotenv
-from token_manager import TokenManager
 
 dotenv.load_dotenv()
 
@@ -11,9 +10,6 @@ intents = discord.Intents.default()
 intents.message_content = True
 discord_bot = commands.Bot(command_prefix='!', intents=intents)
 
-# Initialize token manager
-token_manager = TokenManager()
-
 # Load cogs
 async def load_extensions():
     extensions = [
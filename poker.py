@@ -8,7 +8,8 @@ from collections import Counter
 from dataclasses import dataclass, field
 from enum import Enum
 import math
-from token_manager import TokenManager
+import atexit
+from token_manager import token_manager
 
 # Poker game classes and enums
 class Suit(Enum):
@@ -61,6 +62,7 @@ class Player:
     current_bet: int = 0
     total_bet: int = 0
     cards: List[Card] = field(default_factory=list)
+    hand_str: str = ""  # Hole cards rendered once per deal
     folded: bool = False
     all_in: bool = False
     acted: bool = False
@@ -98,7 +100,7 @@ class Poker(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.tables: Dict[int, PokerTable] = {}
-        self.token_manager = TokenManager()
+        self.token_manager = token_manager
         
         # Check for flush
         suit_counts = {}
@@ -188,6 +190,9 @@ class Poker(commands.Cog):
         
         return best_hand
 
+    async def cog_unload(self):
+        cash_out_all_tables()
+
 class PokerTable:
     def __init__(self, channel_id: int, private_channel_id: int, small_blind: int = 10, big_blind: int = 20):
         self.channel_id = channel_id
@@ -200,11 +205,27 @@ class PokerTable:
         self.small_blind = small_blind
         self.big_blind = big_blind
         self.dealer_position = 0
+        self.sb_position = 0
+        self.bb_position = 0
         self.current_player = 0
         self.state = GameState.WAITING
         self.side_pots = []
         self.game_active = False
         self.lobby_message_id = None
+        self.lobby_message: Optional[discord.Message] = None
+        # Lobby embed is rebuilt only when the players or game status change
+        self.lobby_embed: Optional[discord.Embed] = None
+        self.lobby_embed_dirty = True
+        self.last_lobby_embed: Optional[dict] = None
+        self.lobby_update_pending = False
+        self.lobby_update_task: Optional[asyncio.Task] = None
+        # Players who left mid-hand; they are cashed out once the hand ends
+        self.leaving: set = set()
+        # Serialises actions so two commands can't advance the round at once
+        self.lock = asyncio.Lock()
+        # Resolved channel objects, cached at creation to skip get_channel lookups
+        self.lobby_channel: Optional[discord.TextChannel] = None
+        self.private_channel: Optional[discord.TextChannel] = None
     
     def add_player(self, user_id: int, username: str, chips: int) -> bool:
         if len(self.players) >= 9 or any(p.user_id == user_id for p in self.players):
@@ -212,14 +233,23 @@ class PokerTable:
         
         player = Player(user_id, username, chips)
         self.players.append(player)
+        self.lobby_embed_dirty = True
         return True
     
     def remove_player(self, user_id: int) -> bool:
+        self.lobby_embed_dirty = True
         if self.game_active:
-            # Mark as folded if game is active
-            for player in self.players:
+            # Fold out of the running hand; the seat is freed when it ends
+            for i, player in enumerate(self.players):
                 if player.user_id == user_id:
-                    player.folded = True
+                    self.leaving.add(user_id)
+                    if i == self.current_player and not player.folded and not player.all_in:
+                        # Their turn, so fold normally to pass the action on
+                        self.player_action(user_id, "fold")
+                    else:
+                        player.folded = True
+                        if self.should_end_game_early():
+                            self.advance_game_state()
                     return True
             return False
         else:
@@ -231,7 +261,10 @@ class PokerTable:
         if len(self.players) < 2:
             return False
         
+        # Players may have left since the button moved, keep it on a real seat
+        self.dealer_position %= len(self.players)
         self.game_active = True
+        self.lobby_embed_dirty = True
         self.deck.reset()
         self.community_cards = []
         self.pot = 0
@@ -241,6 +274,7 @@ class PokerTable:
         # Reset player states
         for player in self.players:
             player.cards = []
+            player.hand_str = ""
             player.current_bet = 0
             player.total_bet = 0
             player.folded = False
@@ -253,6 +287,9 @@ class PokerTable:
                 if not player.folded:
                     player.cards.append(self.deck.deal())
         
+        for player in self.players:
+            player.hand_str = " ".join(str(card) for card in player.cards)
+        
         # Post blinds
         self.post_blinds()
         self.state = GameState.PREFLOP
@@ -269,6 +306,10 @@ class PokerTable:
             sb_pos = (self.dealer_position + 1) % len(self.players)
             bb_pos = (self.dealer_position + 2) % len(self.players)
         
+        # Remember blind seats for the rest of the hand
+        self.sb_position = sb_pos
+        self.bb_position = bb_pos
+        
         # Small blind
         sb_amount = min(self.small_blind, self.players[sb_pos].chips)
         self.players[sb_pos].chips -= sb_amount
@@ -361,6 +402,7 @@ class PokerTable:
         else:
             self.advance_to_next_player()
         
+        self.lobby_embed_dirty = True
         return True, f"Action successful: {action}"
     
     def advance_to_next_player(self):
@@ -488,6 +530,16 @@ class PokerTable:
             self.state = GameState.SHOWDOWN
             self.determine_winner()
     
+    def pop_leavers(self) -> List[Player]:
+        """Unseat players who left during the hand that just ended"""
+        if self.game_active or not self.leaving:
+            return []
+        leavers = [p for p in self.players if p.user_id in self.leaving]
+        self.players = [p for p in self.players if p.user_id not in self.leaving]
+        self.leaving.clear()
+        self.lobby_embed_dirty = True
+        return leavers
+    
     def should_end_game_early(self) -> bool:
         """Check if the game should end early (only one non-folded player)"""
         active_players = [p for p in self.players if not p.folded]
@@ -524,8 +576,6 @@ class PokerTable:
             winnings_per_player = self.pot // len(winners)
             for winner, _, _, _ in winners:
                 winner.chips += winnings_per_player
-                user_tokens[str(winner.user_id)] = winner.chips
-                save_user_tokens(user_tokens)
             
             self.pot = 0
         
@@ -539,6 +589,84 @@ class PokerTable:
 intents.guild_messages = True
 bot = commands.Bot(command_prefix='!', intents=intents)
 
+def create_lobby_embed(table: PokerTable) -> discord.Embed:
+    if not table.lobby_embed_dirty and table.lobby_embed is not None:
+        return table.lobby_embed
+    
+    if table.players:
+        players_list = []
+        for i, player in enumerate(table.players):
+            status = "🔘 " if table.game_active and i == table.dealer_position else ""
+            players_list.append(f"{status}{player.username} ({player.chips} chips)")
+        players_name, players_value = f"Players ({len(table.players)}/9)", "\n".join(players_list)
+    else:
+        players_name, players_value = "Players (0/9)", "No players yet"
+    
+    status_value = "🎮 Game in progress" if table.game_active else "⏳ Waiting for players"
+    
+    if table.lobby_embed is not None:
+        # Title, description and colour never change, only rewrite the fields
+        embed = table.lobby_embed.copy()
+        embed.set_field_at(0, name=players_name, value=players_value, inline=False)
+        embed.set_field_at(1, name="Status", value=status_value, inline=False)
+    else:
+        description = f"Small Blind: {table.small_blind} | Big Blind: {table.big_blind}"
+        if table.private_channel:
+            description += f"\nPrivate Channel: {table.private_channel.mention}"
+        
+        embed = discord.Embed(
+            title="🃏 Poker Table Lobby",
+            description=description,
+            color=0x00ff00
+        )
+        embed.add_field(name=players_name, value=players_value, inline=False)
+        embed.add_field(name="Status", value=status_value, inline=False)
+    
+    table.lobby_embed = embed
+    table.lobby_embed_dirty = False
+    return embed
+
+async def edit_lobby_message(table: PokerTable, embed: discord.Embed):
+    """Edit the cached lobby message, only fetching it if no reference is cached"""
+    embed_data = embed.to_dict()
+    if embed_data == table.last_lobby_embed:
+        return  # Nothing visible changed, skip the request
+    
+    if table.lobby_message is None:
+        if not (table.lobby_channel and table.lobby_message_id):
+            return
+        try:
+            table.lobby_message = await table.lobby_channel.fetch_message(table.lobby_message_id)
+        except discord.HTTPException:
+            return
+    
+    try:
+        await table.lobby_message.edit(embed=embed)
+        table.last_lobby_embed = embed_data
+    except discord.NotFound:
+        # Stale reference, refetch on the next update
+        table.lobby_message = None
+    except discord.HTTPException:
+        pass
+
+# Join/leave clicks within this window are folded into one lobby edit
+LOBBY_UPDATE_DELAY = 0.5
+
+def schedule_lobby_update(table: PokerTable):
+    """Queue a lobby edit unless one is already waiting to run"""
+    if table.lobby_update_pending:
+        return
+    table.lobby_update_pending = True
+    table.lobby_update_task = asyncio.create_task(debounced_lobby_update(table))
+
+async def debounced_lobby_update(table: PokerTable):
+    await asyncio.sleep(LOBBY_UPDATE_DELAY)
+    # Same lock as player actions, so an older embed can't land after a newer one
+    async with table.lock:
+        # Clear before building so changes during the edit schedule a new one
+        table.lobby_update_pending = False
+        await edit_lobby_message(table, create_lobby_embed(table))
+
 # Button Views
 class PokerLobbyView(discord.ui.View):
     def __init__(self, table: PokerTable):
@@ -550,79 +678,59 @@ class PokerLobbyView(discord.ui.View):
         user_id = interaction.user.id
         username = interaction.user.display_name
         
-        chips = user_tokens.get(str(user_id), 1000)
+        # Chips are held by the table until the player leaves
+        chips = token_manager.reserve_tokens(str(user_id))
         
         if self.table.add_player(user_id, username, chips):
             await interaction.response.send_message(f"🎲 {username} joined the table with {chips} chips!", ephemeral=True)
             await self.update_lobby_message(interaction)
         else:
+            token_manager.release_tokens(str(user_id), chips)
             await interaction.response.send_message("❌ Could not join table (table full or already joined)", ephemeral=True)
 
     @discord.ui.button(label='Leave Table', style=discord.ButtonStyle.red, emoji='👋')
     async def leave_table(self, interaction: discord.Interaction, button: discord.ui.Button):
         user_id = interaction.user.id
         
-        # Save chips before leaving
-        for player in self.table.players:
-            if player.user_id == user_id:
-                chip_db.set_player_chips(user_id, player.chips)
-                break
-        
-        if self.table.remove_player(user_id):
-            await interaction.response.defer()
-            await self.update_lobby_message(interaction)
-        else:
-            await interaction.response.defer()
-            await self.update_lobby_message(interaction)
+        async with self.table.lock:
+            if not self.table.game_active:
+                # Between hands the stack goes straight back to the player's balance
+                for player in self.table.players:
+                    if player.user_id == user_id:
+                        token_manager.release_tokens(str(user_id), player.chips)
+                        break
+                self.table.remove_player(user_id)
+                await interaction.response.defer()
+            elif self.table.remove_player(user_id):
+                # Folding may have passed the turn or ended the hand
+                if self.table.game_active:
+                    await interaction.response.send_message("👋 You folded and will be cashed out when this hand ends.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("👋 You folded and have been cashed out.", ephemeral=True)
+                await self.send_game_state(interaction.guild)
+                cash_out_leavers(self.table)
+            else:
+                await interaction.response.defer()
+        await self.update_lobby_message(interaction)
     
     @discord.ui.button(label='Start Game', style=discord.ButtonStyle.primary, emoji='🎮')
     async def start_game(self, interaction: discord.Interaction, button: discord.ui.Button):
         if self.table.start_game():
-            # Setup permissions for private channel
-            await self.setup_private_channel_permissions(interaction.guild)
-            
+            # Respond first, then run the independent channel setup and deal concurrently
             await interaction.response.send_message("🎮 Game started! Check the private poker channel.", ephemeral=True)
-            await self.send_game_state(interaction.guild)
-            await self.send_private_cards(interaction.guild)
+            await asyncio.gather(
+                self.setup_private_channel_permissions(interaction.guild),
+                self.send_game_state(interaction.guild),
+                self.send_private_cards(interaction.guild)
+            )
         else:
             await interaction.response.send_message("❌ Cannot start game (need at least 2 players)", ephemeral=True)
     
     async def update_lobby_message(self, interaction: discord.Interaction):
-        embed = discord.Embed(
-            title="🃏 Poker Table Lobby",
-            description=f"Small Blind: {self.table.small_blind} | Big Blind: {self.table.big_blind}",
-            color=0x00ff00
-        )
-        
-        if self.table.players:
-            players_list = []
-            for i, player in enumerate(self.table.players):
-                status = "🔘 " if self.table.game_active and i == self.table.dealer_position else ""
-                players_list.append(f"{status}{player.username} ({player.chips} chips)")
-            embed.add_field(name=f"Players ({len(self.table.players)}/9)", value="\n".join(players_list), inline=False)
-        else:
-            embed.add_field(name="Players (0/9)", value="No players yet", inline=False)
-        
-        if self.table.game_active:
-            embed.add_field(name="Status", value="🎮 Game in progress", inline=False)
-        else:
-            embed.add_field(name="Status", value="⏳ Waiting for players", inline=False)
-        
-        try:
-            await interaction.edit_original_response(embed=embed, view=self)
-        except:
-            # If we can't edit the original response, try to edit the message
-            if self.table.lobby_message_id:
-                channel = interaction.guild.get_channel(self.table.channel_id)
-                if channel:
-                    try:
-                        message = await channel.fetch_message(self.table.lobby_message_id)
-                        await message.edit(embed=embed, view=self)
-                    except:
-                        pass
+        schedule_lobby_update(self.table)
     
     async def send_game_state(self, guild: discord.Guild):
-        private_channel = guild.get_channel(self.table.private_channel_id)
+        private_channel = self.table.private_channel
         if not private_channel:
             return
         
@@ -637,20 +745,28 @@ class PokerLobbyView(discord.ui.View):
             cards_str = " ".join(str(card) for card in self.table.community_cards)
             embed.add_field(name="Community Cards", value=cards_str, inline=False)
         
+        # Seat markers only change between hands, so build them once per render
+        num_players = len(self.table.players)
+        dealer_tags = [""] * num_players
+        dealer_tags[self.table.dealer_position] = "🔘 "
+        blind_tags = [""] * num_players
+        if self.table.game_active:
+            blind_tags[self.table.sb_position] = " (SB)"
+            blind_tags[self.table.bb_position] = " (BB)"
+        
         # Show players
         players_info = []
         for i, player in enumerate(self.table.players):
-            status = ""
-            if i == self.table.dealer_position:
-                status += "🔘 "
+            parts = [dealer_tags[i]]
             if i == self.table.current_player and not player.folded and self.table.state != GameState.ENDED:
-                status += "▶️ "
+                parts.append("▶️ ")
             if player.folded:
-                status += "❌ "
+                parts.append("❌ ")
             if player.all_in:
-                status += "🔥 "
+                parts.append("🔥 ")
+            status = "".join(parts)
             
-            players_info.append(f"{status}{player.username}: {player.chips} chips (bet: {player.current_bet})")
+            players_info.append(f"{status}{player.username}{blind_tags[i]}: {player.chips} chips (bet: {player.current_bet})")
         
         embed.add_field(name="Players", value="\n".join(players_info), inline=False)
         
@@ -659,10 +775,8 @@ class PokerLobbyView(discord.ui.View):
             if hasattr(self.table, 'showdown_hands') and self.table.showdown_hands:
                 showdown_text = []
                 for player, hand_rank, tiebreakers, all_cards in self.table.showdown_hands:
-                    # Get best 5-card hand
-                    best_hand = HandEvaluator.get_best_hand(all_cards)
                     hand_name = HandEvaluator.get_hand_name(hand_rank)
-                    showdown_text.append(f"**{player.username}:** {' '.join(str(c) for c in player.cards)} → {hand_name}")
+                    showdown_text.append(f"**{player.username}:** {player.hand_str} → {hand_name}")
                 
                 embed.add_field(name="🃏 Showdown", value="\n".join(showdown_text), inline=False)
             
@@ -676,80 +790,122 @@ class PokerLobbyView(discord.ui.View):
         await private_channel.send(embed=embed)
     
     async def send_private_cards(self, guild: discord.Guild):
-        for player in self.table.players:
-            if not player.folded and player.cards:
-                user = guild.get_member(player.user_id)
-                if user:
-                    cards_str = " ".join(str(card) for card in player.cards)
-                    embed = discord.Embed(
-                        title="🂠 Your Hole Cards",
-                        description=f"**{cards_str}**",
-                        color=0xff9900
-                    )
-                    embed.add_field(name="Game Channel", value=f"<#{self.table.private_channel_id}>", inline=False)
-                    
-                    # Try to send DM first
-                    dm_sent = False
+        # Send every player's cards concurrently so DM latency doesn't add up per seat
+        await asyncio.gather(
+            *(self.send_player_cards(guild, player) for player in self.table.players
+              if not player.folded and player.cards)
+        )
+    
+    async def send_player_cards(self, guild: discord.Guild, player: Player):
+        # Cache hit in the common case, only hit the API for uncached members
+        user = guild.get_member(player.user_id)
+        if user is None:
+            try:
+                user = await guild.fetch_member(player.user_id)
+            except discord.HTTPException:
+                user = None
+        if user:
+            cards_str = player.hand_str
+            embed = discord.Embed(
+                title="🂠 Your Hole Cards",
+                description=f"**{cards_str}**",
+                color=0xff9900
+            )
+            embed.add_field(name="Game Channel", value=f"<#{self.table.private_channel_id}>", inline=False)
+            
+            # Try to send DM first
+            dm_sent = False
+            try:
+                await user.send(embed=embed)
+                dm_sent = True
+            except discord.Forbidden:
+                print(f"Cannot send DM to {user.display_name}, trying alternative method")
+            except Exception as e:
+                print(f"Error sending DM to {user.display_name}: {str(e)}")
+            
+            # If DM failed, send in private channel with delete_after
+            if not dm_sent:
+                private_channel = self.table.private_channel
+                if private_channel:
                     try:
-                        await user.send(embed=embed)
-                        dm_sent = True
-                    except discord.Forbidden:
-                        print(f"Cannot send DM to {user.display_name}, trying alternative method")
+                        # Send a message that deletes after 30 seconds
+                        await private_channel.send(
+                            f"🂠 **{user.mention}** - Your hole cards: **{cards_str}**\n"
+                            f"*(This message will be deleted in 30 seconds for privacy)*",
+                            delete_after=30
+                        )
                     except Exception as e:
-                        print(f"Error sending DM to {user.display_name}: {str(e)}")
-                    
-                    # If DM failed, send in private channel with delete_after
-                    if not dm_sent:
-                        private_channel = guild.get_channel(self.table.private_channel_id)
-                        if private_channel:
-                            try:
-                                # Send a message that deletes after 30 seconds
-                                await private_channel.send(
-                                    f"🂠 **{user.mention}** - Your hole cards: **{cards_str}**\n"
-                                    f"*(This message will be deleted in 30 seconds for privacy)*",
-                                    delete_after=30
-                                )
-                            except Exception as e:
-                                print(f"Failed to send cards to private channel for {user.display_name}: {str(e)}")
-                                # Last resort: send without auto-delete
-                                try:
-                                    await private_channel.send(
-                                        f"🂠 **{user.mention}** - Your hole cards: **{cards_str}**\n"
-                                        f"*(Please note this message is visible to all players)*"
-                                    )
-                                except Exception as e:
-                                    print(f"Complete failure to send cards to {user.display_name}: {str(e)}")
+                        print(f"Failed to send cards to private channel for {user.display_name}: {str(e)}")
+                        # Last resort: send without auto-delete
+                        try:
+                            await private_channel.send(
+                                f"🂠 **{user.mention}** - Your hole cards: **{cards_str}**\n"
+                                f"*(Please note this message is visible to all players)*"
+                            )
+                        except Exception as e:
+                            print(f"Complete failure to send cards to {user.display_name}: {str(e)}")
 
     # Also add this method to help with permissions on the private channel
     async def setup_private_channel_permissions(self, guild: discord.Guild):
         """Setup permissions for the private poker channel so all players can see it"""
-        private_channel = guild.get_channel(self.table.private_channel_id)
+        private_channel = self.table.private_channel
         if not private_channel:
             return
         
-        # Add read permissions for all players at the table
-        for player in self.table.players:
-            user = guild.get_member(player.user_id)
-            if user:
-                try:
-                    await private_channel.set_permissions(
-                        user, 
-                        read_messages=True, 
-                        send_messages=True,
-                        read_message_history=True
-                    )
-                except discord.Forbidden:
-                    print(f"Cannot set permissions for {user.display_name}")
-                except Exception as e:
-                    print(f"Error setting permissions for {user.display_name}: {str(e)}")
+        # Add read permissions for all players at the table in parallel
+        members = [guild.get_member(player.user_id) for player in self.table.players]
+        await asyncio.gather(
+            *(self.grant_channel_access(private_channel, user) for user in members if user)
+        )
+    
+    async def grant_channel_access(self, private_channel: discord.TextChannel, user: discord.Member):
+        try:
+            await private_channel.set_permissions(
+                user, 
+                read_messages=True, 
+                send_messages=True,
+                read_message_history=True
+            )
+        except discord.Forbidden:
+            print(f"Cannot set permissions for {user.display_name}")
+        except Exception as e:
+            print(f"Error setting permissions for {user.display_name}: {str(e)}")
 
 # Global state
 tables: Dict[int, PokerTable] = {}
+tables_by_private_channel: Dict[int, PokerTable] = {}
 chip_db = ChipDatabase()
 
-@bot.event
-async def on_ready():
-    print(f'{bot.user} has connected to Discord!')
+# Permission overwrites for private game channels, shared by every table
+HIDDEN_OVERWRITE = discord.PermissionOverwrite(read_messages=False)
+BOT_OVERWRITE = discord.PermissionOverwrite(read_messages=True, send_messages=True)
+
+def cash_out_leavers(table: PokerTable):
+    """Once a hand is over, pay out anyone who left during it"""
+    for player in table.pop_leavers():
+        token_manager.release_tokens(str(player.user_id), player.chips)
+
+def cash_out_all_tables():
+    """Return every seated stack to its owner's balance, calling off any hand in progress"""
+    refunds: Dict[str, int] = {}
+    for table in tables.values():
+        task = table.lobby_update_task
+        if task is not None and not task.done():
+            task.cancel()
+        for player in table.players:
+            # Bets in an unfinished hand go back to the players who made them
+            refund = player.chips + (player.total_bet if table.game_active else 0)
+            refunds[str(player.user_id)] = refunds.get(str(player.user_id), 0) + refund
+        table.players = []
+        table.game_active = False
+    tables.clear()
+    tables_by_private_channel.clear()
+    # One balance update and one write, even at exit where every change would save on its own
+    token_manager.release_tokens_bulk(refunds)
+    token_manager.flush()
+
+# Table stacks live outside the token file, so hand them back before it's written on exit
+atexit.register(cash_out_all_tables)
 
 @bot.command(name='poker')
 async def create_table(ctx, small_blind: int = 10, big_blind: int = 20):
@@ -764,8 +920,8 @@ async def create_table(ctx, small_blind: int = 10, big_blind: int = 20):
     try:
         # Create private poker channel
         overwrites = {
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            guild.me: discord.PermissionOverwrite(read_messages=True, send_messages=True)
+            guild.default_role: HIDDEN_OVERWRITE,
+            guild.me: BOT_OVERWRITE
         }
         
         private_channel = await guild.create_text_channel(
@@ -777,20 +933,18 @@ async def create_table(ctx, small_blind: int = 10, big_blind: int = 20):
         
         # Create table
         table = PokerTable(channel_id, private_channel.id, small_blind, big_blind)
+        table.lobby_channel = ctx.channel
+        table.private_channel = private_channel
         tables[channel_id] = table
+        tables_by_private_channel[private_channel.id] = table
         
         # Create lobby embed with buttons
-        embed = discord.Embed(
-            title="🃏 Poker Table Lobby",
-            description=f"Small Blind: {small_blind} | Big Blind: {big_blind}\nPrivate Channel: {private_channel.mention}",
-            color=0x00ff00
-        )
-        embed.add_field(name="Players (0/9)", value="No players yet", inline=False)
-        embed.add_field(name="Status", value="⏳ Waiting for players", inline=False)
-        
+        embed = create_lobby_embed(table)
         view = PokerLobbyView(table)
         message = await ctx.send(embed=embed, view=view)
         table.lobby_message_id = message.id
+        table.lobby_message = message
+        table.last_lobby_embed = embed.to_dict()
         
     except discord.Forbidden:
         await ctx.send("❌ I don't have permission to create channels!")
@@ -807,11 +961,6 @@ async def leave_table_cmd(ctx):
     """Legacy leave command - redirects to use buttons"""
     await ctx.send("Please use the **Leave Table** button in the lobby message above! 👋")
 
-@bot.command(name='start')
-async def start_game_cmd(ctx):
-    """Legacy start command - redirects to use buttons"""
-    await ctx.send("Please use the **Start Game** button in the lobby message above! 🎮")
-
 @bot.command(name='call')
 async def call_action(ctx):
     """Call the current bet"""
@@ -837,74 +986,35 @@ async def handle_player_action(ctx, action: str, amount: int = 0):
     user_id = ctx.author.id
     
     # Find the table that has this private channel
-    table = None
-    for main_channel_id, t in tables.items():
-        if t.private_channel_id == channel_id:
-            table = t
-            break
+    table = tables_by_private_channel.get(channel_id)
     
     if not table:
         await ctx.send("❌ This is not a poker game channel!")
         return
     
-    success, message = table.player_action(user_id, action, amount)
-    
-    if success:
-        # Get the lobby view to update game state
-        main_channel = ctx.guild.get_channel(table.channel_id)
-        if main_channel and table.lobby_message_id:
-            try:
-                lobby_message = await main_channel.fetch_message(table.lobby_message_id)
-                view = PokerLobbyView(table)
-                await view.send_game_state(ctx.guild)
-                
-                # Update lobby message
-                embed = discord.Embed(
-                    title="🃏 Poker Table Lobby",
-                    description=f"Small Blind: {table.small_blind} | Big Blind: {table.big_blind}",
-                    color=0x00ff00
-                )
-                
-                if table.players:
-                    players_list = []
-                    for i, player in enumerate(table.players):
-                        status = "🔘 " if table.game_active and i == table.dealer_position else ""
-                        players_list.append(f"{status}{player.username} ({player.chips} chips)")
-                    embed.add_field(name=f"Players ({len(table.players)}/9)", value="\n".join(players_list), inline=False)
-                else:
-                    embed.add_field(name="Players (0/9)", value="No players yet", inline=False)
-                
-                embed.add_field(name="Status", value="🎮 Game in progress", inline=False)
-                
-                await lobby_message.edit(embed=embed, view=view)
-            except:
-                pass
+    async with table.lock:
+        success, message = table.player_action(user_id, action, amount)
         
-        # Save chips after each action
-        for player in table.players:
-            chip_db.set_player_chips(player.user_id, player.chips)
-    else:
-        await ctx.send(f"❌ {message}")
+        if success:
+            await PokerLobbyView(table).send_game_state(ctx.guild)
+            
+            cash_out_leavers(table)
+            
+            # Update lobby message
+            await edit_lobby_message(table, create_lobby_embed(table))
+        else:
+            await ctx.send(f"❌ {message}")
 
 @bot.command(name='status')
 async def table_status(ctx):
     """Show current table status"""
     channel_id = ctx.channel.id
     
-    # Check if this is a main channel with a table
-    if channel_id in tables:
-        table = tables[channel_id]
-    else:
-        # Check if this is a private poker channel
-        table = None
-        for main_channel_id, t in tables.items():
-            if t.private_channel_id == channel_id:
-                table = t
-                break
-        
-        if not table:
-            await ctx.send("No poker table associated with this channel!")
-            return
+    # Main channel first, then the private poker channel
+    table = tables.get(channel_id) or tables_by_private_channel.get(channel_id)
+    if not table:
+        await ctx.send("No poker table associated with this channel!")
+        return
     
     embed = discord.Embed(
         title="📊 Table Status",
@@ -913,17 +1023,17 @@ async def table_status(ctx):
     
     if table.players:
         players_info = []
+        game_active = table.game_active
         for i, player in enumerate(table.players):
             status = ""
-            if table.game_active:
-                if i == table.dealer_position:
-                    status += "🔘 "
-                if i == table.current_player and not player.folded:
-                    status += "▶️ "
-                if player.folded:
-                    status += "❌ "
-                if player.all_in:
-                    status += "🔥 "
+            if game_active:
+                folded = player.folded
+                status = (
+                    f"{'🔘 ' if i == table.dealer_position else ''}"
+                    f"{'▶️ ' if i == table.current_player and not folded else ''}"
+                    f"{'❌ ' if folded else ''}"
+                    f"{'🔥 ' if player.all_in else ''}"
+                )
             
             players_info.append(f"{status}{player.username}: {player.chips} chips")
         
@@ -942,7 +1052,7 @@ async def table_status(ctx):
     else:
         embed.add_field(name="Game State", value="Waiting for players", inline=False)
     
-    private_channel = ctx.guild.get_channel(table.private_channel_id)
+    private_channel = table.private_channel
     if private_channel:
         embed.add_field(name="Private Channel", value=private_channel.mention, inline=False)
     
@@ -1003,11 +1113,7 @@ async def show_my_cards(interaction: discord.Interaction):
     user_id = interaction.user.id
     
     # Find the table that has this private channel
-    table = None
-    for main_channel_id, t in tables.items():
-        if t.private_channel_id == channel_id:
-            table = t
-            break
+    table = tables_by_private_channel.get(channel_id)
     
     if not table:
         await interaction.response.send_message("❌ This is not a poker game channel!", ephemeral=True)
@@ -1028,7 +1134,7 @@ async def show_my_cards(interaction: discord.Interaction):
         await interaction.response.send_message("❌ You don't have any cards!", ephemeral=True)
         return
     
-    cards_str = " ".join(str(card) for card in player.cards)
+    cards_str = player.hand_str
     embed = discord.Embed(
         title="🂠 Your Hole Cards",
         description=f"**{cards_str}**",
@@ -1065,7 +1171,7 @@ async def start_game(ctx):
         # Start the game
         if table.start_game():
             await ctx.send("🎮 Game started! Check the private poker channel.")
-            await ctx.guild.get_channel(table.private_channel_id).send("🎮 Game started!")
+            await table.private_channel.send("🎮 Game started!")
             await PokerLobbyView(table).send_game_state(ctx.guild)
             await PokerLobbyView(table).send_private_cards(ctx.guild)
         else:
@@ -2,16 +2,16 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import random
-from token_manager import TokenManager
+from token_manager import token_manager
 
 class Roulette(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.bets = {}
         self.current_game = None
-        self.wheel = list(range(0, 37))
-        self.colors = {0: "green", **{n: "red" if n % 2 == 1 else "black" for n in range(1, 37)}}
-        self.token_manager = TokenManager()
+        # Bit n is set when pocket n is red; 0 is green and the rest are black
+        self.red_mask = sum(1 << n for n in (1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36))
+        self.token_manager = token_manager
 
     @app_commands.command(name="roulette", description="Play roulette")
     @app_commands.describe(amount="Amount to bet", number="Number to bet on (0-36)", color="Color to bet on (red/black)")
@@ -30,7 +30,7 @@ class Roulette(commands.Cog):
             return
 
         user_id = str(interaction.user.id)
-        chips = user_tokens.get(user_id, 1000)
+        chips = self.token_manager.get_tokens(user_id)
         
         if chips < amount:
             await interaction.response.send_message(f"❌ You don't have enough chips! You have {chips} chips.", ephemeral=True)
@@ -58,8 +58,7 @@ class Roulette(commands.Cog):
         self.current_game["bets"].append(bet)
         self.current_game["players"].add(user_id)
 
-        user_tokens[user_id] -= amount
-        save_user_tokens(user_tokens)
+        self.token_manager.remove_tokens(user_id, amount)
 
         await interaction.response.send_message(
             f"💰 Bet placed! {amount} chips on {number if number else color}",
@@ -75,8 +74,11 @@ class Roulette(commands.Cog):
             return
 
         # Spin the wheel
-        winning_number = random.choice(self.wheel)
-        winning_color = self.colors[winning_number]
+        winning_number = random.randrange(37)
+        if (self.red_mask >> winning_number) & 1:
+            winning_color = "red"
+        else:
+            winning_color = "black" if winning_number else "green"
 
         # Determine winners
         winners = []
@@ -85,12 +87,10 @@ class Roulette(commands.Cog):
             if (bet["number"] == winning_number) or (bet["color"] and bet["color"].lower() == winning_color):
                 multiplier = 35 if bet["number"] == winning_number else 1
                 winnings = bet["amount"] * multiplier
-                user_tokens[bet["user_id"]] += winnings
+                self.token_manager.add_tokens(bet["user_id"], winnings)
                 total_winnings += winnings
                 winners.append((bet["user_id"], winnings))
 
-        save_user_tokens(user_tokens)
-
         # Create embed
         embed = discord.Embed(
             title="roulette 🎰",
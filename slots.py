@@ -2,7 +2,13 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import random
-from token_manager import TokenManager
+from token_manager import token_manager
+
+# Embed colours indexed by whether the spin won
+RESULT_COLORS = (discord.Color.red(), discord.Color.gold())
+
+# Reel display, filled with the three symbols of a spin
+REEL_FMT = "```\n[ {} | {} | {} ]\n```"
 
 class Slots(commands.Cog):
     def __init__(self, bot):
@@ -16,21 +22,21 @@ class Slots(commands.Cog):
             "💰": 5,
             "7️⃣": 10
         }
-        self.token_manager = TokenManager()
+        self.token_manager = token_manager
 
     @app_commands.command(name="slots", description="Play slots machine")
     @app_commands.describe(amount="Amount to bet")
     async def slots(self, interaction: discord.Interaction, amount: int):
         """Play the slots machine"""
         user_id = str(interaction.user.id)
-        chips = user_tokens.get(user_id, 1000)
+        chips = self.token_manager.get_tokens(user_id)
         
         if chips < amount:
             await interaction.response.send_message(f"❌ You don't have enough chips! You have {chips} chips.", ephemeral=True)
             return
 
         # Spin the reels
-        reels = [random.choice(self.symbols) for _ in range(3)]
+        reels = random.choices(self.symbols, k=3)
         
         # Calculate winnings
         winnings = 0
@@ -39,19 +45,14 @@ class Slots(commands.Cog):
         elif reels[0] == reels[1] or reels[1] == reels[2]:  # Two matching
             winnings = amount * self.symbol_values[reels[1]] * 2
 
-        # Update chip balance
-        user_tokens[user_id] -= amount
-        if winnings > 0:
-            user_tokens[user_id] += winnings
-        save_user_tokens(user_tokens)
+        # Update chip balance: the bet and any payout as one net change
+        self.token_manager.add_tokens(user_id, winnings - amount)
 
         # Create embed
         embed = discord.Embed(
             title="🎰 Slots Machine",
-            description="""```
-[ {} | {} | {} ]
-```""".format(*reels),
-            color=discord.Color.gold() if winnings > 0 else discord.Color.red()
+            description=REEL_FMT.format(*reels),
+            color=RESULT_COLORS[winnings > 0]
         )
 
         if winnings > 0:
@@ -1,12 +1,42 @@
 import discord
 from discord.ext import commands
-from token_manager import TokenManager
-from typing import Optional
+from token_manager import token_manager
+from typing import Dict, Optional, Tuple
+import asyncio
+import time
+
+# How long a fetched user stays cached for the leaderboard, in seconds
+USER_CACHE_TTL = 300
 
 class TokenCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.token_manager = TokenManager()
+        self.token_manager = token_manager
+        self.user_cache: Dict[int, Tuple[float, discord.User]] = {}
+
+    async def fetch_cached_user(self, user_id: int) -> Optional[discord.User]:
+        """Fetch a user, reusing the result for USER_CACHE_TTL seconds"""
+        # Users the bot already shares a guild with need no API call at all
+        user = self.bot.get_user(user_id)
+        if user is not None:
+            return user
+        
+        cached = self.user_cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < USER_CACHE_TTL:
+            return cached[1]
+        
+        try:
+            user = await self.bot.fetch_user(user_id)
+        except discord.HTTPException:
+            # Unknown user or a transient API error, skip just this row
+            return None
+        
+        now = time.monotonic()
+        # Drop expired entries so the cache only holds recently seen users
+        for stale_id in [uid for uid, (fetched, _) in self.user_cache.items() if now - fetched >= USER_CACHE_TTL]:
+            del self.user_cache[stale_id]
+        self.user_cache[user_id] = (now, user)
+        return user
 
     @commands.command(name='addtokens')
     @commands.has_permissions(manage_guild=True)
@@ -69,16 +99,19 @@ class TokenCommands(commands.Cog):
             color=discord.Color.gold()
         )
         
-        for i, (user_id, tokens) in enumerate(leaderboard, 1):
-            try:
-                user = await self.bot.fetch_user(int(user_id))
-                embed.add_field(
-                    name=f"#{i} {user.name}",
-                    value=f"{tokens} tokens",
-                    inline=False
-                )
-            except discord.NotFound:
+        # Resolve every entry at once instead of one round trip per row
+        users = await asyncio.gather(
+            *(self.fetch_cached_user(int(user_id)) for user_id, _ in leaderboard)
+        )
+        
+        for i, ((user_id, tokens), user) in enumerate(zip(leaderboard, users), 1):
+            if user is None:
                 continue
+            embed.add_field(
+                name=f"#{i} {user.name}",
+                value=f"{tokens} tokens",
+                inline=False
+            )
         
         await ctx.send(embed=embed)
 
@@ -1,28 +1,70 @@
+import asyncio
+import atexit
+import heapq
 import json
 import os
-from typing import Dict
+import tempfile
+import threading
+from typing import Dict, Optional, Tuple
 import dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 dotenv.load_dotenv()
 
 # Token storage - In production, use a database
 USER_TOKENS_FILE = "user_tokens.json"
+# Seconds to wait before writing, so a burst of changes shares one write
+SAVE_DELAY = 1.0
 
 def load_user_tokens() -> Dict[str, int]:
     """Load user tokens from file"""
     if os.path.exists(USER_TOKENS_FILE):
+        if orjson:
+            with open(USER_TOKENS_FILE, 'rb') as f:
+                return orjson.loads(f.read())
         with open(USER_TOKENS_FILE, 'r') as f:
             return json.load(f)
     return {}
 
 def save_user_tokens(tokens_data: Dict[str, int]):
-    """Save user tokens to file"""
-    with open(USER_TOKENS_FILE, 'w') as f:
-        json.dump(tokens_data, f, indent=2)
+    """Save user tokens to file, using orjson when it's installed"""
+    # Write a temp file and swap it in so a crash mid-write can't truncate the data.
+    # Each write gets its own temp file so concurrent writers never share one.
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(USER_TOKENS_FILE)), suffix=".tmp")
+    try:
+        if orjson:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(tokens_data))
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(tokens_data, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, USER_TOKENS_FILE)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
 
 class TokenManager:
     def __init__(self):
         self.tokens = load_user_tokens()
+        self.dirty = False
+        self.save_handle: Optional[asyncio.TimerHandle] = None
+        self.save_task: Optional[asyncio.Task] = None
+        # Held by every write, from the loop thread or a worker, so they run one at a time
+        self.write_lock = threading.Lock()
+        # Bumped on every balance change so the leaderboard knows when to rebuild
+        self.version = 0
+        # Version last written to disk, so an older snapshot never overwrites a newer one
+        self.saved_version = 0
+        self.leaderboard_cache: Optional[Tuple[int, int, list]] = None
         
     def get_tokens(self, user_id: str) -> int:
         """Get user's token balance"""
@@ -31,34 +73,117 @@ class TokenManager:
     def add_tokens(self, user_id: str, amount: int) -> None:
         """Add tokens to user's balance"""
         self.tokens[user_id] = self.tokens.get(user_id, 1000) + amount
-        save_user_tokens(self.tokens)
+        self.mark_changed()
         
     def remove_tokens(self, user_id: str, amount: int) -> bool:
         """Remove tokens from user's balance"""
         if user_id not in self.tokens:
             self.tokens[user_id] = 1000
+            self.version += 1
         
         if self.tokens[user_id] < amount:
             return False
             
         self.tokens[user_id] -= amount
-        save_user_tokens(self.tokens)
+        self.mark_changed()
         return True
         
+    def mark_changed(self) -> None:
+        """Record a balance change and schedule a write"""
+        self.version += 1
+        self.schedule_save()
+        
+    def schedule_save(self) -> None:
+        """Mark balances as changed and write them after SAVE_DELAY"""
+        self.dirty = True
+        if self.save_handle is not None:
+            return  # A write is already pending and will include this change
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop running, write straight away
+            self.save()
+            return
+        self.save_handle = loop.call_later(SAVE_DELAY, self.start_background_save)
+        
+    def start_background_save(self) -> None:
+        self.save_handle = None
+        self.save_task = asyncio.create_task(self.write_snapshot())
+        
+    async def write_snapshot(self) -> None:
+        """Write a copy of the balances from a worker thread so the event loop isn't blocked"""
+        # Copy on the loop thread so mutations can't change the dict mid-encode
+        version = self.version
+        snapshot = dict(self.tokens)
+        try:
+            await asyncio.to_thread(self.write_tokens, snapshot, version)
+        except Exception as e:
+            print(f"Failed to save user tokens: {e}")
+            # Try again after the usual delay rather than waiting for the next change
+            self.schedule_save()
+            return
+        if self.saved_version == self.version:
+            self.dirty = False
+        
+    def write_tokens(self, tokens_data: Dict[str, int], version: int) -> None:
+        with self.write_lock:
+            if version < self.saved_version:
+                return  # A newer snapshot is already on disk
+            save_user_tokens(tokens_data)
+            self.saved_version = version
+        
+    def save(self) -> None:
+        """Write all balances to disk, waiting for any background write to finish first"""
+        if self.save_handle is not None:
+            self.save_handle.cancel()
+            self.save_handle = None
+        self.write_tokens(self.tokens, self.version)
+        self.dirty = False
+        
+    def flush(self) -> None:
+        """Write pending changes now, if there are any"""
+        if self.dirty:
+            self.save()
+        
     def set_tokens(self, user_id: str, amount: int) -> None:
         """Set user's token balance"""
         self.tokens[user_id] = amount
-        save_user_tokens(self.tokens)
+        self.mark_changed()
+        
+    def reserve_tokens(self, user_id: str) -> int:
+        """Take a user's whole balance out of their account and return it"""
+        amount = self.tokens.get(user_id, 1000)
+        self.tokens[user_id] = 0
+        self.mark_changed()
+        return amount
+        
+    def release_tokens(self, user_id: str, amount: int) -> None:
+        """Return previously reserved tokens to a user's balance"""
+        self.add_tokens(user_id, amount)
+        
+    def release_tokens_bulk(self, amounts: Dict[str, int]) -> None:
+        """Return reserved tokens to several users with a single save"""
+        if not amounts:
+            return
+        for user_id, amount in amounts.items():
+            self.tokens[user_id] = self.tokens.get(user_id, 1000) + amount
+        self.mark_changed()
         
     def can_afford(self, user_id: str, amount: int) -> bool:
         """Check if user can afford the amount"""
         return self.tokens.get(user_id, 1000) >= amount
         
     def get_leaderboard(self, limit: int = 10) -> list:
-        """Get token leaderboard"""
-        sorted_users = sorted(
-            self.tokens.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        return sorted_users[:limit]
+        """Get token leaderboard, reusing the last result until a balance changes"""
+        cached = self.leaderboard_cache
+        if cached and cached[0] == self.version and cached[1] == limit:
+            return cached[2]
+        
+        leaderboard = heapq.nlargest(limit, self.tokens.items(), key=lambda x: x[1])
+        self.leaderboard_cache = (self.version, limit, leaderboard)
+        return leaderboard
+
+# Shared instance so every cog reads and writes the same balances
+token_manager = TokenManager()
+# A pending delayed write would be lost when the event loop stops, so write it on exit
+atexit.register(token_manager.flush)